@@ -1,24 +1,75 @@
 import os
-from typing import List, Dict
+import re
+import sys
+import asyncio
+import contextlib
+import functools
+import dbm
+import hashlib
+from dataclasses import dataclass
+from enum import IntEnum
+from types import MappingProxyType
+from typing import List, Dict, Optional, Tuple
+import orjson
 from dotenv import load_dotenv
-from openai import OpenAI
-import json
+from openai import AsyncOpenAI
+from pydantic import BaseModel
 
-# Load API key from .env file
-load_dotenv()
-client = OpenAI(api_key="")
 
+def _new_client() -> AsyncOpenAI:
+    """
+    Build an OpenAI client when it's needed rather than at import time. The client
+    is bound to the running event loop, so the caller owns it and must close it.
+    """
+    # Load API key from .env file
+    load_dotenv()
+    # Rate limits and dropped connections are usually transient; the SDK retries them
+    # with exponential backoff and jitter before llm_agent falls back to the rule-based plan
+    return AsyncOpenAI(
+        api_key=os.environ["OPENAI_API_KEY"],
+        timeout=30,  # Fail a stalled request fast rather than waiting on the 10-minute default
+        max_retries=3,
+    )
+
+
+# On-disk cache of LLM plans as orjson bytes, keyed by a hash of the prompt
+_LLM_CACHE_PATH = ".llm_cache_json"
+
+
+def _cache_get(key: str) -> Optional[Dict]:
+    """Look up a cached plan; a missing or unreadable cache counts as a miss."""
+    try:
+        with dbm.open(_LLM_CACHE_PATH, "r") as cache:
+            if key in cache:
+                return orjson.loads(cache[key])
+    except (*dbm.error, orjson.JSONDecodeError):
+        pass
+    return None
+
+
+def _cache_put(key: str, plan: Dict) -> None:
+    """Store a plan; if the cache can't be written, the plan is simply not cached."""
+    try:
+        with dbm.open(_LLM_CACHE_PATH, "c") as cache:
+            cache[key] = orjson.dumps(plan)
+    except dbm.error:
+        pass
+
+
+# Hard cap on generated tokens; the model is told about it so it self-prioritizes
+_MAX_OUTPUT_TOKENS = 500
+# Fits all seven weekday keys filled with short descriptions (~400 tokens)
+_DIRECT_MAX_OUTPUT_TOKENS = 400
+
+@dataclass(slots=True, frozen=True)
 class FitnessUser:
     """Represents a fitness app user."""
-    def __init__(self, id: str, age: int, fitness_level: int, 
-                 goals: List[str], preferences: List[str], 
-                 limitations: List[str] = None):
-        self.id = id
-        self.age = age
-        self.fitness_level = fitness_level
-        self.goals = goals
-        self.preferences = preferences
-        self.limitations = limitations or []
+    id: str
+    age: int
+    fitness_level: int
+    goals: Tuple[str, ...]
+    preferences: Tuple[str, ...]
+    limitations: Tuple[str, ...] = ()
 
     def __str__(self):
         return f"User {self.id}: Level {self.fitness_level}, Goals: {', '.join(self.goals)}"
@@ -32,110 +83,171 @@ class FitnessUser:
 # - session duration
 # based on fitness level and goals
 
+class Intensity(IntEnum):
+    """Workout intensity, kept as an int through the planner's adjustment chain."""
+    LIGHT = 0
+    MODERATE = 1
+    HIGH = 2
+
+
+class WorkoutType(IntEnum):
+    """Workout type, kept as an int through the planner's adjustment chain."""
+    CARDIO = 0
+    STRENGTH_TRAINING = 1
+    FLEXIBILITY = 2
+    HIIT = 3
+    ACTIVE_RECOVERY = 4
+    YOGA = 5
+    SWIMMING = 6
+
+
+# Planner lookup tables, built once at import time
+_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Codes are only turned back into strings when the schedule is built
+_INTENSITY_NAMES = ("light", "moderate", "high")
+_WORKOUT_NAMES = ("cardio", "strength training", "flexibility", "HIIT",
+                  "active recovery", "yoga", "swimming")
+
+# fitness level -> (workout days, base intensity, base duration, day indices)
+_LEVEL_PARAMS = MappingProxyType({
+    0: (3, Intensity.LIGHT, 30, (0, 2, 4)),           # Beginner: Monday, Wednesday, Friday
+    1: (3, Intensity.LIGHT, 30, (0, 2, 4)),
+    2: (4, Intensity.MODERATE, 45, (0, 2, 4, 6)),     # Intermediate: Monday, Wednesday, Friday, Sunday
+    3: (4, Intensity.MODERATE, 45, (0, 2, 4, 6)),
+    4: (5, Intensity.HIGH, 60, (0, 1, 3, 5, 6)),      # Advanced: Monday, Tuesday, Thursday, Saturday, Sunday
+})
+
+# Map goals to workout types
+_GOAL_TO_WORKOUT = MappingProxyType({
+    "weight management": (WorkoutType.CARDIO, WorkoutType.HIIT, WorkoutType.STRENGTH_TRAINING),
+    "stress reduction": (WorkoutType.YOGA, WorkoutType.ACTIVE_RECOVERY, WorkoutType.CARDIO),
+    "strength building": (WorkoutType.STRENGTH_TRAINING, WorkoutType.HIIT),
+    "joint mobility": (WorkoutType.FLEXIBILITY, WorkoutType.SWIMMING, WorkoutType.YOGA),
+    "endurance": (WorkoutType.CARDIO, WorkoutType.SWIMMING),
+    "muscle gain": (WorkoutType.STRENGTH_TRAINING,),
+    "flexibility": (WorkoutType.YOGA, WorkoutType.FLEXIBILITY)
+})
+
+# One alternation over every goal keyword, scanned in a single pass per user
+_GOAL_RE = re.compile("|".join(map(re.escape, _GOAL_TO_WORKOUT)))
+
+# Descriptions for each workout type, indexed by WorkoutType
+_WORKOUT_DESC = (
+    "Aerobic exercises to improve heart health and endurance",
+    "Focus on building muscle with weights or bodyweight exercises",
+    "Stretching exercises to improve range of motion",
+    "High-intensity interval training for efficient calorie burn",
+    "Light activity to promote recovery and reduce soreness",
+    "Combination of strength, flexibility, and mindfulness",
+    "Low-impact full-body workout in water"
+)
+
+
 def deterministic_agent(user: FitnessUser) -> Dict:
     """
     A rule-based agent that creates workout plans based on user fitness level and goals.
     Returns a dictionary with a weekly schedule.
     """
-    # Initialize weekly schedule
-    weekly_schedule = {}
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    
-    # Determine workout parameters based on fitness level
-    if user.fitness_level <= 1:  # Beginner
-        workout_days = 3
-        base_intensity = "light"
-        base_duration = 30
-        workout_day_indices = [0, 2, 4]  # Monday, Wednesday, Friday
-    elif user.fitness_level <= 3:  # Intermediate
-        workout_days = 4
-        base_intensity = "moderate"
-        base_duration = 45
-        workout_day_indices = [0, 2, 4, 6]  # Monday, Wednesday, Friday, Sunday
-    else:  # Advanced
-        workout_days = 5
-        base_intensity = "high"
-        base_duration = 60
-        workout_day_indices = [0, 1, 3, 5, 6]  # Monday, Tuesday, Thursday, Saturday, Sunday
+    plan = _deterministic_plan(
+        user.age,
+        user.fitness_level,
+        tuple(user.goals),
+        tuple(user.preferences),
+        tuple(user.limitations),
+    )
+    # Copy so callers can't mutate the cached plan
+    return {"weekly_schedule": {day: dict(w) for day, w in plan["weekly_schedule"].items()}}
+
+
+@functools.lru_cache(maxsize=None)
+def _plan_core(level: int, has_time_lim: bool,
+               has_joint_lim: bool) -> Tuple[int, Intensity, int, Tuple[int, ...]]:
+    """
+    Numeric core of the planner: days, intensity, duration and day indices
+    for a clamped fitness level (0-4) and the two limitation flags.
+    """
+    workout_days, base_intensity, base_duration, workout_day_indices = _LEVEL_PARAMS[level]
     
     # Adjust for limitations
-    if any("time" in limitation.lower() for limitation in user.limitations):
+    if has_time_lim:
         base_duration = min(base_duration, 30)
         workout_days = min(workout_days, 4)
         
-    if any("joint" in limitation.lower() for limitation in user.limitations):
-        if base_intensity == "high":
-            base_intensity = "moderate"
+    if has_joint_lim:
+        if base_intensity == Intensity.HIGH:
+            base_intensity = Intensity.MODERATE
     
-    # Map goals to workout types
-    goal_to_workout = {
-        "weight management": ["cardio", "HIIT", "strength training"],
-        "stress reduction": ["yoga", "active recovery", "cardio"],
-        "strength building": ["strength training", "HIIT"],
-        "joint mobility": ["flexibility", "swimming", "yoga"],
-        "endurance": ["cardio", "swimming"],
-        "muscle gain": ["strength training"],
-        "flexibility": ["yoga", "flexibility"]
-    }
+    return workout_days, base_intensity, base_duration, workout_day_indices
+
+
+@functools.lru_cache(maxsize=1024)
+def _deterministic_plan(age: int, fitness_level: int, goals: Tuple[str, ...],
+                        preferences: Tuple[str, ...], limitations: Tuple[str, ...]) -> Dict:
+    """Cached core of the deterministic planner, keyed on hashable user fields."""
+    # Initialize weekly schedule
+    weekly_schedule = {}
     
-    # Select workout types based on user's goals
+    # Determine workout parameters based on fitness level and limitations
+    # Lowercase once; newline-join so a keyword can't match across two limitations
+    lims = "\n".join(limitations).lower()
+    workout_days, base_intensity, base_duration, workout_day_indices = _plan_core(
+        max(0, min(fitness_level, 4)), "time" in lims, "joint" in lims
+    )
+    
+    # Select workout types based on user's goals, dropping duplicates while preserving order
+    seen = set()
     user_workout_types = []
-    for goal in user.goals:
-        for g, workouts in goal_to_workout.items():
-            if g.lower() in goal.lower():
-                user_workout_types.extend(workouts)
+    # Newline-join so a keyword can't match across two separate goals
+    joined = "\n".join(goals).lower()
+    for m in _GOAL_RE.finditer(joined):
+        for w in _GOAL_TO_WORKOUT[m.group()]:
+            if w not in seen:
+                seen.add(w)
+                user_workout_types.append(w)
     
     # If no workouts were selected, use a default set
     if not user_workout_types:
-        user_workout_types = ["cardio", "strength training", "flexibility"]
-    
-    # Remove duplicates while preserving order
-    user_workout_types = list(dict.fromkeys(user_workout_types))
+        user_workout_types = [WorkoutType.CARDIO, WorkoutType.STRENGTH_TRAINING, WorkoutType.FLEXIBILITY]
+        seen.update(user_workout_types)
     
     # Consider user preferences
-    for pref in user.preferences:
-        if "swimming" in pref.lower() and "swimming" not in user_workout_types:
-            user_workout_types.append("swimming")
-        elif "outdoor" in pref.lower() and "cardio" not in user_workout_types:
-            user_workout_types.append("cardio")
-        elif "home" in pref.lower() and all(w not in user_workout_types for w in ["yoga", "HIIT"]):
-            user_workout_types.append("HIIT")
-    
-    # Create descriptions for each workout type
-    workout_descriptions = {
-        "strength training": "Focus on building muscle with weights or bodyweight exercises",
-        "cardio": "Aerobic exercises to improve heart health and endurance",
-        "flexibility": "Stretching exercises to improve range of motion",
-        "HIIT": "High-intensity interval training for efficient calorie burn",
-        "active recovery": "Light activity to promote recovery and reduce soreness",
-        "yoga": "Combination of strength, flexibility, and mindfulness",
-        "swimming": "Low-impact full-body workout in water"
-    }
+    for pref in preferences:
+        pl = pref.lower()
+        if "swimming" in pl and WorkoutType.SWIMMING not in seen:
+            seen.add(WorkoutType.SWIMMING)
+            user_workout_types.append(WorkoutType.SWIMMING)
+        elif "outdoor" in pl and WorkoutType.CARDIO not in seen:
+            seen.add(WorkoutType.CARDIO)
+            user_workout_types.append(WorkoutType.CARDIO)
+        elif "home" in pl and WorkoutType.YOGA not in seen and WorkoutType.HIIT not in seen:
+            seen.add(WorkoutType.HIIT)
+            user_workout_types.append(WorkoutType.HIIT)
     
     # Create the weekly schedule
     for i in range(min(workout_days, len(workout_day_indices))):
-        day = days[workout_day_indices[i]]
+        day = _DAYS[workout_day_indices[i]]
         workout_type = user_workout_types[i % len(user_workout_types)]
         
         # Adjust intensity based on workout type
         intensity = base_intensity
-        if workout_type == "active recovery" and intensity != "light":
-            intensity = "light"
-        elif workout_type == "HIIT" and intensity == "light":
-            intensity = "moderate"
+        if workout_type == WorkoutType.ACTIVE_RECOVERY and intensity != Intensity.LIGHT:
+            intensity = Intensity.LIGHT
+        elif workout_type == WorkoutType.HIIT and intensity == Intensity.LIGHT:
+            intensity = Intensity.MODERATE
         
         # Adjust duration based on workout type
         duration = base_duration
-        if workout_type == "HIIT" and duration > 30:
+        if workout_type == WorkoutType.HIIT and duration > 30:
             duration = 30
-        elif workout_type == "yoga" and duration < 45:
+        elif workout_type == WorkoutType.YOGA and duration < 45:
             duration = 45
         
         weekly_schedule[day] = {
-            "type": workout_type,
+            "type": _WORKOUT_NAMES[workout_type],
             "duration": duration,
-            "intensity": intensity,
-            "description": workout_descriptions.get(workout_type, "Custom workout")
+            "intensity": _INTENSITY_NAMES[intensity],
+            "description": _WORKOUT_DESC[workout_type]
         }
     
     return {"weekly_schedule": weekly_schedule}
@@ -148,20 +260,52 @@ def deterministic_agent(user: FitnessUser) -> Dict:
 # We've handled the API part. Your task is to COMPLETE THE PROMPT below
 # that will instruct the LLM how to generate the plan.
 
-def llm_agent(user: FitnessUser) -> Dict:
-    goals_text = ", ".join(user.goals)
-    preferences_text = ", ".join(user.preferences)
-    limitations_text = ", ".join(user.limitations) if user.limitations else "None"
+class Workout(BaseModel):
+    """A single scheduled session in an LLM plan."""
+    type: str
+    duration: int
+    intensity: str
+    description: str
 
-    prompt = f"""
-As a certified fitness trainer, create a personalized weekly workout plan for this client.
 
-Client Information:
-- Age: {user.age}
-- Fitness Level: {user.fitness_level}/5 (1=beginner, 5=advanced)
-- Goals: {goals_text}
-- Preferences: {preferences_text}
-- Limitations: {limitations_text}
+class WeeklySchedule(BaseModel):
+    """Workout days only; rest days are left as None."""
+    Monday: Optional[Workout]
+    Tuesday: Optional[Workout]
+    Wednesday: Optional[Workout]
+    Thursday: Optional[Workout]
+    Friday: Optional[Workout]
+    Saturday: Optional[Workout]
+    Sunday: Optional[Workout]
+
+
+class DirectPlan(BaseModel):
+    """Structured output for the direct-answer prompt."""
+    weekly_schedule: WeeklySchedule
+
+
+class WeeklyPlan(BaseModel):
+    """
+    Structured output for the chain-of-thought prompt. Structured Outputs emits
+    keys in declaration order, so the thoughts must come before the schedule.
+    """
+    thoughts: List[str]
+    reasoning: str
+    weekly_schedule: WeeklySchedule
+    considerations: Optional[str]
+
+
+# Static prompt text goes first so every request shares the same prefix,
+# which lets OpenAI's automatic prompt caching reuse it across users
+_DIRECT_INSTRUCTIONS = """
+Return only the JSON weekly_schedule for the client below. No reasoning.
+Schedule 3 workout days (e.g. Monday, Wednesday, Friday) and set the other days to null.
+Keep each description under 12 words.
+Format: {"weekly_schedule": {"Monday": {"type": "cardio", "duration": 30, "intensity": "light", "description": "Specific exercises"}, "Tuesday": null, ...}}
+"""
+
+_STATIC_INSTRUCTIONS = """
+As a certified fitness trainer, create a personalized weekly workout plan for the client described at the end.
 
 THINK STEP-BY-STEP using this process:
 
@@ -192,66 +336,112 @@ Step 6: Create Specific Workouts
 
 Output Format:
 Return ONLY a valid JSON object (no markdown, no extra text) with this structure:
-{{
-    "chain_of_thought": {{
-        "step_1_fitness_assessment": "Your analysis of their fitness level...",
-        "step_2_goal_analysis": "Breaking down their goals...",
-        "step_3_limitations_impact": "How limitations affect the plan...",
-        "step_4_preferences_integration": "How to incorporate preferences...",
-        "step_5_weekly_structure": "Reasoning for number of days and workout distribution...",
-        "step_6_final_decisions": "Key decisions made for this specific plan..."
-    }},
-    "reasoning": "1-2 sentence summary of the overall approach",
-    "weekly_schedule": {{
-        "Monday": {{
+{
+    "thoughts": ["One short bullet per step above", "..."],
+    "reasoning": "One sentence summary of the overall approach",
+    "weekly_schedule": {
+        "Monday": {
             "type": "cardio",
             "duration": 30,
             "intensity": "moderate",
             "description": "Specific exercises with details"
-        }}
-    }},
-    "considerations": "Special adaptations or progressive recommendations"
-}}
+        }
+    },
+    "considerations": "Optional: special adaptations or progressions"
+}
 
 Important:
-- Work through ALL 6 steps in your chain_of_thought
-- Be specific in each reasoning step
-- Only include workout days in weekly_schedule
+- Work through ALL 6 steps, one entry each in thoughts (max 6 items)
+- Maximum 15 words per thought; no prose outside JSON
+- Set rest days to null in weekly_schedule
 - Ensure proper JSON formatting
 - Use realistic durations (20-60 minutes)
 - Make descriptions actionable
 """
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a certified fitness trainer specializing in personalized workout planning. You think step-by-step before creating plans. Always respond with valid JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Slightly higher for better reasoning
+
+async def llm_agent(user: FitnessUser, client: Optional[AsyncOpenAI] = None) -> Dict:
+    """
+    Plan a week for one user with the LLM. Pass a shared client to reuse it across
+    calls on the same event loop; otherwise one is created and closed for this call.
+    """
+    goals_text = ", ".join(user.goals)
+    preferences_text = ", ".join(user.preferences)
+    limitations_text = ", ".join(user.limitations) if user.limitations else "None"
+
+    # Beginners without limitations get a plan from two lookups; CoT only adds latency
+    direct = user.fitness_level <= 1 and not user.limitations
+    if direct:
+        max_tokens = _DIRECT_MAX_OUTPUT_TOKENS
+        prompt = _DIRECT_INSTRUCTIONS + (
+            f"Client: age={user.age}, fitness level={user.fitness_level}/5, "
+            f"goals={goals_text}, preferences={preferences_text}\n"
         )
-        result_text = response.choices[0].message.content
-        
-        # Clean up potential markdown formatting
-        result_text = result_text.strip()
-        if result_text.startswith("```json"):
-            result_text = result_text[7:]
-        if result_text.startswith("```"):
-            result_text = result_text[3:]
-        if result_text.endswith("```"):
-            result_text = result_text[:-3]
-        result_text = result_text.strip()
-        
-        return json.loads(result_text)
+    else:
+        max_tokens = _MAX_OUTPUT_TOKENS
+        prompt = _STATIC_INSTRUCTIONS + f"""
+Client Information:
+- Age: {user.age}
+- Fitness Level: {user.fitness_level}/5 (1=beginner, 5=advanced)
+- Goals: {goals_text}
+- Preferences: {preferences_text}
+- Limitations: {limitations_text}
+"""
+
+    system_prompt = (
+        "You are a certified fitness trainer specializing in personalized workout planning. "
+        + ("" if direct else "You think step-by-step before creating plans. ")
+        + "Always respond with valid JSON only. "
+        f"Responses longer than {max_tokens} tokens will be truncated, so keep it brief."
+    )
+
+    # Simple clients don't need the larger model
+    model = "gpt-4.1-nano" if user.fitness_level <= 2 and not user.limitations else "gpt-4o-mini"
+
+    response_format = DirectPlan if direct else WeeklyPlan
+    temperature = 0.3  # Slightly higher for better reasoning
+
+    # Identical requests get identical plans, so skip the API call on a cache hit.
+    # The schema and generation settings are part of the key, so changing them
+    # never serves plans generated under the old ones.
+    schema = orjson.dumps(response_format.model_json_schema(), option=orjson.OPT_SORT_KEYS)
+    cache_key = hashlib.sha256(
+        f"{model}\n{temperature}\n{max_tokens}\n".encode() + schema
+        + f"\n{system_prompt}\n{prompt}".encode()
+    ).hexdigest()
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(_new_client())
+            # The SDK validates the response against the schema and returns a typed object
+            completion = await client.beta.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=response_format,
+            )
+        parsed = completion.choices[0].message.parsed
+        if parsed is None:
+            raise ValueError(completion.choices[0].message.refusal or "No structured output returned")
+
+        # Rest days come back as None; keep only workout days, as the deterministic plan does
+        result = parsed.model_dump(exclude_none=True)
+        _cache_put(cache_key, result)
+        return result
 
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error for {user.id}: {e}")
         fallback = deterministic_agent(user)
         return {
-            "chain_of_thought": {
-                "error": f"LLM failed: {str(e)}"
-            },
+            "thoughts": [f"LLM failed: {str(e)}"],
             "reasoning": "Fallback to rule-based plan due to error",
             "weekly_schedule": fallback["weekly_schedule"],
             "considerations": "Using deterministic agent as backup."
@@ -260,41 +450,55 @@ Important:
 
 # ======== COMPARISON LOGIC (DO NOT EDIT) ========
 
+async def _llm_plans(users: List[FitnessUser]) -> List[Dict]:
+    """Run the LLM agent for all users concurrently over one client for this event loop."""
+    async with contextlib.AsyncExitStack() as stack:
+        try:
+            client = await stack.enter_async_context(_new_client())
+        except KeyError:
+            # No API key; each llm_agent call reports it and falls back
+            client = None
+        return await asyncio.gather(*(llm_agent(u, client) for u in users))
+
+
 def compare_workout_planning(users: List[FitnessUser]):
+    # Overlap the network waits for every user before printing
+    llm_plans = asyncio.run(_llm_plans(users))
+
     print("\n===== WORKOUT PLAN COMPARISON =====")
-    for i, user in enumerate(users, 1):
-        print(f"\n--- User {i}: {user.id} ---")
-        print(f"Age: {user.age} | Fitness Level: {user.fitness_level}/5")
-        print(f"Goals: {', '.join(user.goals)}")
-        print(f"Preferences: {', '.join(user.preferences)}")
-        print(f"Limitations: {', '.join(user.limitations)}")
+    for i, (user, llm_plan) in enumerate(zip(users, llm_plans), 1):
+        buf = []
+        buf.append(f"\n--- User {i}: {user.id} ---")
+        buf.append(f"Age: {user.age} | Fitness Level: {user.fitness_level}/5")
+        buf.append(f"Goals: {', '.join(user.goals)}")
+        buf.append(f"Preferences: {', '.join(user.preferences)}")
+        buf.append(f"Limitations: {', '.join(user.limitations)}")
 
         det_plan = deterministic_agent(user)
-        print("\n[Deterministic Agent]")
+        buf.append("\n[Deterministic Agent]")
         for day, workout in det_plan["weekly_schedule"].items():
-            print(f"- {day}: {workout['type']} ({workout['intensity']}, {workout['duration']} min)")
+            buf.append(f"- {day}: {workout['type']} ({workout['intensity']}, {workout['duration']} min)")
 
-        llm_plan = llm_agent(user)
-        print("\n[LLM Agent with Chain-of-Thought]")
+        buf.append("\n[LLM Agent with Chain-of-Thought]")
         
         # Display the thinking process
-        if "chain_of_thought" in llm_plan:
-            print("\n🧠 THINKING PROCESS:")
-            cot = llm_plan["chain_of_thought"]
-            for step_key, step_value in cot.items():
-                step_name = step_key.replace("_", " ").title()
-                print(f"  {step_name}:")
-                print(f"    {step_value}")
+        if "thoughts" in llm_plan:
+            buf.append("\n🧠 THINKING PROCESS:")
+            cot = llm_plan["thoughts"]
+            for step_num, thought in enumerate(cot, 1):
+                buf.append(f"  {step_num}. {thought}")
         
-        print(f"\n📋 REASONING: {llm_plan.get('reasoning', 'No reasoning provided')}")
+        buf.append(f"\n📋 REASONING: {llm_plan.get('reasoning', 'No reasoning provided')}")
         
-        print("\n📅 WEEKLY SCHEDULE:")
+        buf.append("\n📅 WEEKLY SCHEDULE:")
         for day, workout in llm_plan["weekly_schedule"].items():
-            print(f"- {day}: {workout['type']} ({workout['intensity']}, {workout['duration']} min)")
-            print(f"  → {workout['description']}")
+            buf.append(f"- {day}: {workout['type']} ({workout['intensity']}, {workout['duration']} min)")
+            buf.append(f"  → {workout['description']}")
         
-        print(f"\n⚠️  CONSIDERATIONS: {llm_plan.get('considerations', 'None')}")
-        print("-" * 80)
+        buf.append(f"\n⚠️  CONSIDERATIONS: {llm_plan.get('considerations', 'None')}")
+        buf.append("-" * 80)
+        # One write per user instead of one per line
+        sys.stdout.write("\n".join(buf) + "\n")
 
 
 # ======== SAMPLE USERS ========
@@ -305,17 +509,17 @@ def main():
             id="U001",
             age=35,
             fitness_level=2,
-            goals=["weight management", "stress reduction"],
-            preferences=["home workouts", "morning routines"],
-            limitations=["limited equipment", "time constraints (max 30 min/day)"]
+            goals=("weight management", "stress reduction"),
+            preferences=("home workouts", "morning routines"),
+            limitations=("limited equipment", "time constraints (max 30 min/day)")
         ),
         FitnessUser(
             id="U002",
             age=55,
             fitness_level=3,
-            goals=["joint mobility", "strength building"],
-            preferences=["outdoor activities", "swimming"],
-            limitations=["mild joint stiffness"]
+            goals=("joint mobility", "strength building"),
+            preferences=("outdoor activities", "swimming"),
+            limitations=("mild joint stiffness",)
         )
     ]
 